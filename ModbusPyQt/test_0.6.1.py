@@ -22,7 +22,8 @@ Tested on Python 3.11 · pymodbus 3.9.2
 """
 
 from __future__ import annotations
-import sys, csv, datetime, asyncio, contextlib
+import sys, datetime, asyncio, contextlib, time, queue, threading
+from collections import deque
 from pathlib import Path
 from typing import Optional, List
 
@@ -30,21 +31,28 @@ from typing import Optional, List
 try:
     from PySide6.QtWidgets import (
         QApplication, QWidget, QLineEdit, QSpinBox, QDoubleSpinBox, QComboBox,
-        QPushButton, QTextEdit, QFormLayout, QHBoxLayout, QMessageBox
+        QPushButton, QPlainTextEdit, QCheckBox, QFormLayout, QHBoxLayout, QMessageBox
     )
-    from PySide6.QtCore import Qt, Signal, QObject
-    from PySide6.QtGui import QTextCursor
+    from PySide6.QtCore import Qt, Signal, QObject, QTimer
 except ModuleNotFoundError:
     from PyQt6.QtWidgets import (
         QApplication, QWidget, QLineEdit, QSpinBox, QDoubleSpinBox, QComboBox,
-        QPushButton, QTextEdit, QFormLayout, QHBoxLayout, QMessageBox
+        QPushButton, QPlainTextEdit, QCheckBox, QFormLayout, QHBoxLayout, QMessageBox
     )
-    from PyQt6.QtCore import Qt, pyqtSignal as Signal, QObject
-    from PyQt6.QtGui import QTextCursor
+    from PyQt6.QtCore import Qt, pyqtSignal as Signal, QObject, QTimer
 
+import numpy as np
 from pymodbus.client import AsyncModbusTcpClient
 import qasync
 
+# qasync 가 Qt 이벤트 루프를 감싸므로 GUI 루프 자체에는 영향이 없지만,
+# 별도 스레드/보조 루프가 생길 때를 대비해 가능한 경우 uvloop·winloop 정책을 설치한다.
+try:
+    import uvloop; asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    with contextlib.suppress(ImportError):
+        import winloop; asyncio.set_event_loop_policy(winloop.EventLoopPolicy())
+
 TABLE_MAP = {
     "Coil"           : ("read_coils",             0, 1),
     "Discrete Input" : ("read_discrete_inputs",   0, 1),
@@ -52,29 +60,39 @@ TABLE_MAP = {
     "Input Register" : ("read_input_registers",   100, 1),
 }
 FMT_LIST = ["word 16 +", "word 16 +/-", "dword 32 +", "dword 32 +/-"]
+FLUSH_EVERY = 100       # CSV 버퍼를 디스크로 내리는 주기(행)
+FMT_DTYPE = {                      # 레지스터(u16) 배열을 재해석할 numpy dtype
+    "word 16 +": np.uint16, "word 16 +/-": np.int16,
+    "dword 32 +": np.uint32, "dword 32 +/-": np.int32,
+}
+
+# 로그 1줄 포맷: list.__repr__ 대신 orjson(가능하면) 또는 단순 join 사용
+try:
+    import orjson; _dump = lambda d: orjson.dumps(d).decode()
+except ImportError:
+    _dump = lambda d: "[" + ",".join(map(str, d)) + "]"
 
 # ───────────────────────────────── Worker ────────────────────
 class ModbusWorker(QObject):
     log_ready = Signal(str); finished = Signal()
 
-    def __init__(self, ip: str, port: int, method: str, addr: int, count: int, fmt: str, interval: float = 1):
+    def __init__(self, ip: str, port: int, method: str, addr: int, count: int, fmt: str, interval: float = 1,
+                 delta_mode: bool = False):
         super().__init__(); self.ip, self.port, self.method = ip, port, method
         self.addr, self.count, self.fmt, self.interval = addr, count, fmt, interval
+        self._dtype = FMT_DTYPE[fmt]
+        self.delta_mode = delta_mode          # True: 값이 바뀐 poll 만 CSV 기록(100회마다 heartbeat)
+        self._prev: Optional[List[int]] = None; self._heartbeat = 0
         self._running = True
 
     def stop(self): self._running = False
 
     # ------- helpers --------
-    @staticmethod
-    def _u16_to_s16(x: int) -> int: return x-65536 if x & 0x8000 else x
-    @staticmethod
-    def _u32_to_s32(x: int) -> int: return x-4294967296 if x & 0x80000000 else x
-
     def _decode_regs(self, regs: List[int]) -> List[int]:
-        if self.fmt.startswith("word"):
-            return [self._u16_to_s16(r) if "+/-" in self.fmt else r for r in regs]
-        pairs = [(regs[i] | (regs[i+1] << 16)) for i in range(0, len(regs)-1, 2)]
-        return [self._u32_to_s32(v) for v in pairs] if "+/-" in self.fmt else pairs
+        arr = np.asarray(regs, dtype="<u2")   # LE 워드 → pair 재해석이 low | high<<16 과 일치
+        if self._dtype in (np.uint32, np.int32) and arr.size & 1:
+            arr = arr[:-1]                    # 홀수 개 레지스터면 마지막 word 는 pair 불가
+        return arr.view(self._dtype).tolist()
 
     # -------------------------
     async def run(self):
@@ -82,26 +100,43 @@ class ModbusWorker(QObject):
         try:
             if not await client.connect():
                 self.log_ready.emit("❌ connect failed\n"); return
+            read = getattr(client, self.method)   # poll 루프에서 매번 getattr 하지 않도록 1회 바인딩
             csv_p = Path(f"modbus_log_{datetime.datetime.now():%Y%m%d_%H%M%S}.csv")
             self.log_ready.emit(f"📂  기록 파일: {csv_p}\n")  # ← 파일 경로 로그
-            with csv_p.open("w", newline="") as f:
-                writer = csv.writer(f)
+            with csv_p.open("wb", buffering=1<<16) as f:
+                # 필드가 타임스탬프/정수뿐이라 quoting 이 필요 없음 → csv 모듈 우회.
+                # 디스크 지연(NFS 등)이 poll 주기를 밀지 않도록 실제 쓰기는 전용 스레드가 맡는다.
+                q: queue.Queue = queue.Queue(maxsize=10000)
+                def _writer():
+                    rows = 0
+                    while True:
+                        line = q.get()
+                        if line is None: break
+                        f.write(line); rows += 1
+                        if rows % FLUSH_EVERY == 0: f.flush()
+                wt = threading.Thread(target=_writer, daemon=True); wt.start()
+                def write_row(cells): q.put_nowait(",".join(cells).encode() + b"\n")
                 hdr_cnt = self.count//2 if self.fmt.startswith("dword") else self.count
-                writer.writerow(["timestamp"] + [f"val{i}" for i in range(hdr_cnt)])
-                while self._running:
-                    if self.method in ("read_coils", "read_discrete_inputs"):
-                        data = []
-                        for off in range(self.count):
-                            rr = await getattr(client, self.method)(self.addr+off, count=1)
-                            data.append(int(rr.bits[0]) if not rr.isError() else -1)
-                    else:
-                        rr = await getattr(client, self.method)(self.addr, count=self.count)
-                        data = self._decode_regs(rr.registers if not rr.isError() else [])
-                    now = datetime.datetime.now()
-                    ts  = f"{now:%Y-%m-%dT%H:%M:%S}.{now.microsecond//100000}"
-                    writer.writerow([ts]+data)
-                    self.log_ready.emit(f"{ts}  {data}\n")
-                    await asyncio.sleep(self.interval)
+                write_row(["timestamp"] + [f"val{i}" for i in range(hdr_cnt)])
+                row = [""] * (1 + hdr_cnt)   # poll 마다 재사용하는 행 버퍼(매회 리스트 생성 회피)
+                try:
+                    while self._running:
+                        if self.method in ("read_coils", "read_discrete_inputs"):
+                            rr = await read(self.addr, count=self.count)
+                            data = [int(b) for b in rr.bits[:self.count]] if not rr.isError() else [-1]*self.count
+                        else:
+                            rr = await read(self.addr, count=self.count)
+                            data = self._decode_regs(rr.registers if not rr.isError() else [])
+                        t = time.time()
+                        ts = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(t)) + f".{int(t*10)%10}"
+                        self._heartbeat += 1
+                        if not self.delta_mode or data != self._prev or self._heartbeat % 100 == 0:
+                            row[0] = ts; row[1:] = [str(v) for v in data]; write_row(row)
+                            self._prev = list(data)
+                        self.log_ready.emit(f"{ts}  {_dump(data)}\n")
+                        await asyncio.sleep(self.interval)
+                finally:
+                    q.put(None); wt.join()   # 큐에 남은 줄을 모두 내려쓴 뒤 파일을 닫는다
         except Exception as e:
             self.log_ready.emit(f"🚨 {e}\n")
         finally:
@@ -111,7 +146,11 @@ class ModbusWorker(QObject):
 class MainWindow(QWidget):
     def __init__(self):
         super().__init__(); self.setWindowTitle("Modbus‑TCP Monitor"); self.resize(760,520)
-        self.worker: Optional[ModbusWorker] = None; self._build_ui()
+        self.worker: Optional[ModbusWorker] = None
+        self._log_buf: deque[str] = deque(maxlen=10000)
+        self._log_timer = QTimer(self); self._log_timer.setInterval(200)
+        self._log_timer.timeout.connect(self._drain_log); self._log_timer.start()
+        self._build_ui()
 
     def _build_ui(self):
         form = QFormLayout(self)
@@ -125,9 +164,10 @@ class MainWindow(QWidget):
         form.addRow("Server IP", self.ip); form.addRow("Port", self.port); form.addRow("Table", self.table)
         form.addRow("Start addr", self.addr); form.addRow("Count", self.cnt); form.addRow("Format", self.fmt)
         form.addRow("Poll interval", self.interval)
+        self.delta = QCheckBox("Log only changes"); form.addRow("CSV", self.delta)
         row = QHBoxLayout(); self.start = QPushButton("Start"); self.stop = QPushButton("Stop"); self.stop.setEnabled(False)
         row.addWidget(self.start); row.addWidget(self.stop); form.addRow(row)
-        self.log = QTextEdit(); self.log.setReadOnly(True); form.addRow(self.log)
+        self.log = QPlainTextEdit(); self.log.setReadOnly(True); self.log.setMaximumBlockCount(5000); form.addRow(self.log)
         self.start.clicked.connect(self.start_poll); self.stop.clicked.connect(self.stop_poll)
 
     def _update_defaults(self, name: str):
@@ -142,7 +182,8 @@ class MainWindow(QWidget):
             return
         mtd,_a,_c = TABLE_MAP[self.table.currentText()]
         self.worker = ModbusWorker(self.ip.text().strip(), self.port.value(), mtd,
-                                   self.addr.value(), self.cnt.value(), self.fmt.currentText(), self.interval.value())
+                                   self.addr.value(), self.cnt.value(), self.fmt.currentText(), self.interval.value(),
+                                   delta_mode=self.delta.isChecked())
         self.worker.log_ready.connect(self.append_log); self.worker.finished.connect(self.on_finished)
         self.start.setEnabled(False); self.stop.setEnabled(True)
         asyncio.create_task(self.worker.run())
@@ -155,8 +196,12 @@ class MainWindow(QWidget):
         self.append_log("▶︎  작업 종료\n")  # ← 종료 메시지
 
     def append_log(self, msg: str):
-        self.log.moveCursor(QTextCursor.End); self.log.insertPlainText(msg)
-        self.log.moveCursor(QTextCursor.End)
+        self._log_buf.append(msg)   # 위젯 반영은 _drain_log(QTimer)에서 일괄 처리
+
+    def _drain_log(self):
+        if not self._log_buf: return
+        text = "".join(self._log_buf); self._log_buf.clear()
+        self.log.appendPlainText(text.rstrip("\n"))   # 자동 스크롤 포함, 커서 조작 불필요
 
     def closeEvent(self, ev):
         if self.worker: self.worker.stop(); ev.accept()
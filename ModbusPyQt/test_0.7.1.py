@@ -15,29 +15,37 @@ Tested on Python 3.11 · pymodbus 3.9.2 · pandas 2.x
 """
 
 from __future__ import annotations
-import sys, csv, datetime, asyncio, contextlib
+import sys, datetime, asyncio, contextlib, struct, time, queue, threading
+from collections import deque
 from pathlib import Path
 from typing import Optional, List, Dict
 
+import numpy as np
 import pandas as pd
 try:
     from PySide6.QtWidgets import (
-        QApplication, QWidget, QLineEdit, QSpinBox, QDoubleSpinBox, QPushButton,
-        QTextEdit, QFormLayout, QHBoxLayout, QMessageBox, QFileDialog
+        QApplication, QWidget, QLineEdit, QSpinBox, QDoubleSpinBox, QPushButton, QCheckBox,
+        QPlainTextEdit, QFormLayout, QHBoxLayout, QMessageBox, QFileDialog
     )
-    from PySide6.QtCore import Qt, Signal, QObject
-    from PySide6.QtGui import QTextCursor
+    from PySide6.QtCore import Qt, Signal, QObject, QTimer
 except ModuleNotFoundError:
     from PyQt6.QtWidgets import (
-        QApplication, QWidget, QLineEdit, QSpinBox, QDoubleSpinBox, QPushButton,
-        QTextEdit, QFormLayout, QHBoxLayout, QMessageBox, QFileDialog
+        QApplication, QWidget, QLineEdit, QSpinBox, QDoubleSpinBox, QPushButton, QCheckBox,
+        QPlainTextEdit, QFormLayout, QHBoxLayout, QMessageBox, QFileDialog
     )
-    from PyQt6.QtCore import Qt, pyqtSignal as Signal, QObject
-    from PyQt6.QtGui import QTextCursor
+    from PyQt6.QtCore import Qt, pyqtSignal as Signal, QObject, QTimer
 
 from pymodbus.client import AsyncModbusTcpClient
 import qasync
 
+# qasync 가 Qt 이벤트 루프를 감싸므로 GUI 루프 자체에는 영향이 없지만,
+# 별도 스레드/보조 루프가 생길 때를 대비해 가능한 경우 uvloop·winloop 정책을 설치한다.
+try:
+    import uvloop; asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    with contextlib.suppress(ImportError):
+        import winloop; asyncio.set_event_loop_policy(winloop.EventLoopPolicy())
+
 # ──────────────────────────── constants ────────────────────────────────────
 MEM_METHOD = {
     "M": "read_coils",            # FC01
@@ -46,60 +54,122 @@ MEM_METHOD = {
     "D": "read_holding_registers",# FC03
 }
 
+FLUSH_EVERY = 100                 # CSV 버퍼를 디스크로 내리는 주기(행)
+FMT_ID = {"bit": 0, "u16": 1, "s16": 2, "s32": 3}   # fmt 문자열 비교는 로드 시 1회만
+
+# 로그 1줄 포맷: list.__repr__ 대신 orjson(가능하면) 또는 단순 join 사용
+try:
+    import orjson; _dump = lambda d: orjson.dumps(d).decode()
+except ImportError:
+    _dump = lambda d: "[" + ",".join(map(str, d)) + "]"
+PLAN_GAP = 8                      # 이 간격(주소) 이하로 떨어진 포인트는 한 요청으로 병합
+PLAN_MAX = {                      # Modbus PDU 당 최대 수량 (FC01/02: 2000 bit, FC03/04: 125 reg)
+    "read_coils": 2000, "read_discrete_inputs": 2000,
+    "read_holding_registers": 125, "read_input_registers": 125,
+}
+
 # ───────────────────────────── helpers ─────────────────────────────────────
 class ModbusPoint:
-    __slots__ = ("label", "method", "offset", "size", "fmt", "mem", "plc_addr")
+    __slots__ = ("label", "method", "offset", "size", "fmt", "fmt_id", "mem", "plc_addr")
     def __init__(self, *, label: str, method: str, offset: int, size: int, fmt: str, mem: str, plc_addr: int):
         self.label, self.method, self.offset, self.size, self.fmt = label, method, offset, size, fmt
-        self.mem, self.plc_addr = mem, plc_addr
+        self.fmt_id, self.mem, self.plc_addr = FMT_ID[fmt], mem, plc_addr
+
+class ReadPlan:
+    __slots__ = ("method", "base", "span", "points", "read", "rows",
+                 "bit_rows", "bit_idx", "u16_rows", "u16_idx",
+                 "s16_rows", "s16_idx", "s32_rows", "s32_idx")
+    def __init__(self, *, method: str, base: int, span: int, points: List[ModbusPoint]):
+        self.method, self.base, self.span, self.points = method, base, span, points
+        self.read = None          # run() 에서 connect 후 클라이언트 메서드로 바인딩
+
+def _idx_arrays(slots: List[tuple]) -> tuple:
+    """(row, idx) 쌍 목록 → (row 배열, idx 배열)."""
+    a = np.array(slots, dtype=np.intp).reshape(-1, 2)
+    return a[:, 0], a[:, 1]
+
+def make_plans(points: List[ModbusPoint], gap: int = PLAN_GAP) -> List[ReadPlan]:
+    """포인트를 (method, offset) 순으로 정렬 후 인접 구간을 greedy 병합 → 요청 수 최소화."""
+    plans: List[ReadPlan] = []
+    for method in sorted({pt.method for pt in points}):
+        pts = sorted((pt for pt in points if pt.method == method), key=lambda p: p.offset)
+        i = 0
+        while i < len(pts):
+            base, end, group = pts[i].offset, pts[i].offset + pts[i].size, [pts[i]]; i += 1
+            while i < len(pts) and pts[i].offset - end <= gap and pts[i].offset + pts[i].size - base <= PLAN_MAX[method]:
+                group.append(pts[i]); end = max(end, pts[i].offset + pts[i].size); i += 1
+            plans.append(ReadPlan(method=method, base=base, span=end - base, points=group))
+    return plans
 
-def _u16_to_s16(x: int) -> int: return x-65536 if x & 0x8000 else x
+_S16 = struct.Struct("<h"); _S32 = struct.Struct("<i")   # 포맷 문자열 재파싱을 피하려고 사전 컴파일
 
-def _u32_to_s32(x: int) -> int: return x-4294967296 if x & 0x80000000 else x
+def _u16_to_s16(x: int) -> int: return _S16.unpack(x.to_bytes(2, "little"))[0]
+
+def _u32_to_s32(x: int) -> int: return _S32.unpack(x.to_bytes(4, "little"))[0]
 
 def parse_int(val) -> int:
     if isinstance(val, (int, float)): return int(val)
-    txt = str(val).strip(); return int(txt, 16) if any(c in txt.upper() for c in "ABCDEF") else int(txt)
+    txt = str(val).strip()
+    try: return int(txt)          # 대부분 10진수 → 문자 스캔 없이 바로 변환
+    except ValueError: return int(txt, 16)
 
 def build_mapping(df: pd.DataFrame) -> Dict[str, List[Dict[str,int]]]:
     required = {"mem", "plc_addr", "start_number", "assignment_points"}
     if not required.issubset(df.columns):
         raise ValueError(f"Mapping sheet must contain columns {required}")
-    mp: Dict[str, List[Dict[str,int]]] = {}
-    for _, r in df.iterrows():
-        mem = str(r["mem"]).strip().upper()
-        mp.setdefault(mem, []).append({
-            "plc_base": parse_int(r["plc_addr"]),
-            "mb_base" : parse_int(r["start_number"]),
-            "count"   : int(r["assignment_points"])
-        })
-    for segs in mp.values(): segs.sort(key=lambda s: s["plc_base"])
-    return mp
-
-def plc_to_modbus(mem: str, plc_addr: int, mapping: Dict[str,List[Dict[str,int]]]) -> int:
-    if mem not in mapping: raise KeyError(f"Memory {mem} missing in mapping file")
-    for seg in mapping[mem]:
-        if seg["plc_base"] <= plc_addr < seg["plc_base"] + seg["count"]:
-            return seg["mb_base"] + (plc_addr - seg["plc_base"])
+    norm = pd.DataFrame({
+        "mem"     : df["mem"].astype(str).str.strip().str.upper(),
+        "plc_base": df["plc_addr"].map(parse_int),
+        "mb_base" : df["start_number"].map(parse_int),
+        "count"   : df["assignment_points"].astype(int),
+    })
+    return {mem: sub.sort_values("plc_base")[["plc_base","mb_base","count"]].to_dict("records")
+            for mem, sub in norm.groupby("mem")}
+
+def _mapping_arrays(mapping: Dict[str,List[Dict[str,int]]]) -> Dict[str, tuple]:
+    """세그먼트 목록 → (plc_base, mb_base, count) numpy 배열 (정렬 완료, searchsorted 용)."""
+    return {mem: (np.array([s["plc_base"] for s in segs]),
+                  np.array([s["mb_base"]  for s in segs]),
+                  np.array([s["count"]    for s in segs]))
+            for mem, segs in mapping.items()}
+
+def plc_to_modbus(mem: str, plc_addr: int, arrays: Dict[str, tuple]) -> int:
+    if mem not in arrays: raise KeyError(f"Memory {mem} missing in mapping file")
+    bases, mbs, counts = arrays[mem]
+    i = int(np.searchsorted(bases, plc_addr, side="right")) - 1
+    if i >= 0 and plc_addr < bases[i] + counts[i]:
+        return int(mbs[i] + (plc_addr - bases[i]))
     raise ValueError(f"{mem}{plc_addr} not covered by mapping")
 
+_POINTS_CACHE: Dict[tuple, List[ModbusPoint]] = {}
+
+def load_points_cached(mapping_path: Path, config_path: Path) -> List[ModbusPoint]:
+    """(경로, mtime, size) 키 메모이즈 — 파일이 그대로면 Start 재클릭 시 Excel 파싱 생략."""
+    key = tuple((str(p), p.stat().st_mtime_ns, p.stat().st_size) for p in (mapping_path, config_path))
+    if key not in _POINTS_CACHE:
+        _POINTS_CACHE[key] = load_points(mapping_path, config_path)
+    return _POINTS_CACHE[key]
+
 def load_points(mapping_path: Path, config_path: Path) -> List[ModbusPoint]:
     mp_df  = pd.read_excel(mapping_path)
     cfg_df = pd.read_excel(config_path)
-    mapping = build_mapping(mp_df)
+    arrays = _mapping_arrays(build_mapping(mp_df))
+
+    mems  = cfg_df["mem"].astype(str).str.strip().str.upper()
+    plcs  = cfg_df["plc_addr"].map(parse_int)
+    descs = cfg_df["desc"] if "desc" in cfg_df.columns else pd.Series([None]*len(cfg_df))
+    types = cfg_df["type"] if "type" in cfg_df.columns else pd.Series([None]*len(cfg_df))
 
     pts: List[ModbusPoint] = []
-    for _, r in cfg_df.iterrows():
-        mem = str(r["mem"]).strip().upper()
-        plc_addr = parse_int(r["plc_addr"])
-        label = str(r.get("desc")) if pd.notna(r.get("desc")) else f"{mem}{plc_addr}"
-        mb_addr = plc_to_modbus(mem, plc_addr, mapping)
+    for mem, plc_addr, desc, type_val in zip(mems, plcs, descs, types):
+        label = str(desc) if pd.notna(desc) else f"{mem}{plc_addr}"
+        mb_addr = plc_to_modbus(mem, plc_addr, arrays)
         method = MEM_METHOD.get(mem)
         if method is None: raise ValueError(f"Unsupported memory type {mem}")
 
         if mem == "D":
-            type_val = str(r.get("type")).strip() if pd.notna(r.get("type")) else ""
-            if type_val == "16":
+            type_txt = str(type_val).strip() if pd.notna(type_val) else ""
+            if type_txt == "16":
                 size, fmt = 1, "s16"
             else:
                 size, fmt = 2, "s32"
@@ -112,8 +182,24 @@ def load_points(mapping_path: Path, config_path: Path) -> List[ModbusPoint]:
 # ─────────────────────────── Worker ────────────────────────────────────────
 class ModbusWorker(QObject):
     log_ready = Signal(str); finished = Signal()
-    def __init__(self, ip: str, port: int, points: List[ModbusPoint], interval: float):
+    def __init__(self, ip: str, port: int, points: List[ModbusPoint], interval: float, pipelined: bool = True,
+                 delta_mode: bool = False):
         super().__init__(); self.ip, self.port, self.points, self.interval = ip, port, points, interval
+        self.pipelined = pipelined    # False: 트랜잭션 직렬화를 요구하는 서버용 순차 모드
+        self.delta_mode = delta_mode  # True: 값이 바뀐 poll 만 CSV 기록(100회마다 heartbeat)
+        self._prev: Optional[List[int]] = None; self._heartbeat = 0
+        self.plans = make_plans(points)
+        self._vals = np.empty(len(points), dtype=np.int64)   # poll 마다 재사용하는 출력 버퍼(SoA)
+        row_of = {id(pt): i for i, pt in enumerate(points)}
+        for plan in self.plans:
+            slots: List[List[tuple]] = [[], [], [], []]   # index = fmt_id
+            for pt in plan.points:
+                slots[pt.fmt_id].append((row_of[id(pt)], pt.offset - plan.base))
+            plan.rows = np.array([row_of[id(pt)] for pt in plan.points], dtype=np.intp)
+            plan.bit_rows, plan.bit_idx = _idx_arrays(slots[FMT_ID["bit"]])
+            plan.u16_rows, plan.u16_idx = _idx_arrays(slots[FMT_ID["u16"]])
+            plan.s16_rows, plan.s16_idx = _idx_arrays(slots[FMT_ID["s16"]])
+            plan.s32_rows, plan.s32_idx = _idx_arrays(slots[FMT_ID["s32"]])
         self._running = True
     def stop(self): self._running = False
 
@@ -121,32 +207,59 @@ class ModbusWorker(QObject):
         client = AsyncModbusTcpClient(self.ip, port=self.port)
         try:
             if not await client.connect(): self.log_ready.emit("❌ connect failed\n"); return
+            for plan in self.plans: plan.read = getattr(client, plan.method)
             csv_p = Path(f"modbus_log_{datetime.datetime.now():%Y%m%d_%H%M%S}.csv")
             self.log_ready.emit(f"📂  기록 파일: {csv_p}\n")
-            with csv_p.open("w", newline="") as f:
-                writer = csv.writer(f); writer.writerow(["timestamp"] + [pt.label for pt in self.points])
-                while self._running:
-                    vals: List[int] = []
-                    for pt in self.points:
-                        try:
-                            rr = await getattr(client, pt.method)(pt.offset, count=pt.size)
-                            if rr.isError():
-                                val = -1
-                            elif pt.method in ("read_coils","read_discrete_inputs"):
-                                val = int(rr.bits[0])
-                            else:
-                                if pt.size == 1:
-                                    raw = rr.registers[0]; val = _u16_to_s16(raw) if pt.fmt=="s16" else raw
-                                else:
-                                    low, high = rr.registers[0], rr.registers[1]
-                                    val = _u32_to_s32(low | (high << 16))
-                        except Exception:
-                            val = -1
-                        vals.append(val)
-                    now = datetime.datetime.now(); ts = f"{now:%Y-%m-%dT%H:%M:%S}.{now.microsecond//100000}"
-                    writer.writerow([ts]+vals)
-                    self.log_ready.emit(f"{ts}  {vals}\n")
-                    await asyncio.sleep(self.interval)
+            with csv_p.open("wb", buffering=1<<16) as f:
+                # 필드가 타임스탬프/정수뿐이라 quoting 이 필요 없음 → csv 모듈 우회.
+                # 디스크 지연(NFS 등)이 poll 주기를 밀지 않도록 실제 쓰기는 전용 스레드가 맡는다.
+                q: queue.Queue = queue.Queue(maxsize=10000)
+                def _writer():
+                    rows = 0
+                    while True:
+                        line = q.get()
+                        if line is None: break
+                        f.write(line); rows += 1
+                        if rows % FLUSH_EVERY == 0: f.flush()
+                wt = threading.Thread(target=_writer, daemon=True); wt.start()
+                def write_row(cells): q.put_nowait(",".join(cells).encode() + b"\n")
+                write_row(["timestamp"] + [pt.label for pt in self.points])
+                row = [""] * (1 + len(self.points))   # poll 마다 재사용하는 행 버퍼(매회 리스트 생성 회피)
+                try:
+                    while self._running:
+                        out = self._vals
+                        if self.pipelined:   # 독립 plan 들을 한 RTT 에 파이프라인
+                            results = await asyncio.gather(
+                                *(plan.read(plan.base, count=plan.span) for plan in self.plans),
+                                return_exceptions=True)
+                        else:
+                            results = []
+                            for plan in self.plans:
+                                try: results.append(await plan.read(plan.base, count=plan.span))
+                                except Exception as exc: results.append(exc)
+                        for plan, rr in zip(self.plans, results):
+                            if isinstance(rr, BaseException) or rr.isError():
+                                out[plan.rows] = -1; continue
+                            if plan.method in ("read_coils","read_discrete_inputs"):
+                                bits = np.asarray(rr.bits, dtype=np.uint8)
+                                out[plan.bit_rows] = bits[plan.bit_idx]
+                                continue
+                            regs = np.asarray(rr.registers, dtype=np.uint16)
+                            if plan.u16_rows.size: out[plan.u16_rows] = regs[plan.u16_idx]
+                            if plan.s16_rows.size: out[plan.s16_rows] = regs[plan.s16_idx].view(np.int16)
+                            if plan.s32_rows.size:
+                                u32 = regs[plan.s32_idx].astype(np.uint32) | (regs[plan.s32_idx+1].astype(np.uint32) << 16)
+                                out[plan.s32_rows] = u32.view(np.int32)
+                        vals = out.tolist()
+                        t = time.time(); ts = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(t)) + f".{int(t*10)%10}"
+                        self._heartbeat += 1
+                        if not self.delta_mode or vals != self._prev or self._heartbeat % 100 == 0:
+                            row[0] = ts; row[1:] = [str(v) for v in vals]; write_row(row)
+                            self._prev = vals
+                        self.log_ready.emit(f"{ts}  {_dump(vals)}\n")
+                        await asyncio.sleep(self.interval)
+                finally:
+                    q.put(None); wt.join()   # 큐에 남은 줄을 모두 내려쓴 뒤 파일을 닫는다
         except Exception as e:
             self.log_ready.emit(f"🚨 {e}\n")
         finally:
@@ -156,7 +269,11 @@ class ModbusWorker(QObject):
 class MainWindow(QWidget):
     def __init__(self):
         super().__init__(); self.setWindowTitle("Modbus‑TCP Monitor (Excel v0.7.2)"); self.resize(820,580)
-        self.worker: Optional[ModbusWorker] = None; self._build_ui()
+        self.worker: Optional[ModbusWorker] = None
+        self._log_buf: deque[str] = deque(maxlen=10000)
+        self._log_timer = QTimer(self); self._log_timer.setInterval(200)
+        self._log_timer.timeout.connect(self._drain_log); self._log_timer.start()
+        self._build_ui()
 
     def _build_ui(self):
         form = QFormLayout(self)
@@ -171,10 +288,20 @@ class MainWindow(QWidget):
         form.addRow("Mapping file", row_mp); form.addRow("Config file", row_cf)
         self.interval = QDoubleSpinBox(); self.interval.setRange(0.05,60.0); self.interval.setSingleStep(0.05); self.interval.setValue(1.0); self.interval.setSuffix(" s")
         form.addRow("Poll interval", self.interval)
+        self.delta = QCheckBox("Log only changes"); form.addRow("CSV", self.delta)
         row_btn = QHBoxLayout(); self.start = QPushButton("Start"); self.stop = QPushButton("Stop"); self.stop.setEnabled(False); row_btn.addWidget(self.start); row_btn.addWidget(self.stop); form.addRow(row_btn)
-        self.log = QTextEdit(); self.log.setReadOnly(True); form.addRow(self.log)
+        self.log = QPlainTextEdit(); self.log.setReadOnly(True); self.log.setMaximumBlockCount(5000); form.addRow(self.log)
         self.start.clicked.connect(self.start_poll); self.stop.clicked.connect(self.stop_poll)
 
+    def append_log(self, msg: str):
+        self._log_buf.append(msg)   # 위젯 반영은 _drain_log(QTimer)에서 일괄 처리
+
+    def _drain_log(self):
+        if not self._log_buf: return
+        text = "".join(self._log_buf); self._log_buf.clear()
+        self.log.appendPlainText(text.rstrip("\n"))   # 자동 스크롤 포함, 커서 조작 불필요
+
     def _load_points(self):
         mp_p, cf_p = Path(self.mapping_path.text()).expanduser(), Path(self.config_path.text()).expanduser()
-        if not mp_p.exists() or not cf_p.exists(): raise FileNotFound
+        if not mp_p.exists() or not cf_p.exists(): raise FileNotFoundError("Excel 파일을 찾을 수 없습니다.")
+        return load_points_cached(mp_p, cf_p)
@@ -7,18 +7,18 @@ Modbus-TCP Monitor GUI (PySide6) – v0.8.0
 
 # ────────────────────────── import & 상수 ──────────────────────────
 from __future__ import annotations
-import sys, csv, datetime, asyncio, contextlib
+import sys, os, csv, datetime, asyncio, contextlib, functools, socket, time
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple, DefaultDict
 from collections import defaultdict
-import pandas as pd
+import numpy as np
+import openpyxl
 from dataclasses import dataclass
 from PySide6.QtWidgets import (
     QApplication, QWidget, QLineEdit, QSpinBox, QDoubleSpinBox, QPushButton,
-    QTextEdit, QFormLayout, QHBoxLayout, QMessageBox, QFileDialog
+    QPlainTextEdit, QFormLayout, QHBoxLayout, QMessageBox, QFileDialog
 )
 from PySide6.QtCore import Signal, QObject
-from PySide6.QtGui import QTextCursor
 from pymodbus.client import AsyncModbusTcpClient
 import qasync
 
@@ -30,8 +30,48 @@ MEM_METHOD = {
     "D": "read_holding_registers",
 }
 
-_u16_to_s16 = lambda x: x - 0x10000 if x & 0x8000 else x
-_u32_to_s32 = lambda x: x - 0x100000000 if x & 0x80000000 else x
+MAX_GAP   = 8     # 이 간격 이하의 구멍은 같은 배치로 묶어 round-trip 을 줄인다
+MAX_QTY = {       # Modbus PDU 1회 최대 수량 — 배치가 항상 한 PDU 로 나가도록 분할
+    "read_coils": 2000, "read_discrete_inputs": 2000,
+    "read_holding_registers": 125, "read_input_registers": 125,
+}
+FLUSH_EVERY = 64  # CSV 버퍼를 디스크로 내리는 주기(행)
+
+
+def _enable_nodelay(client) -> None:
+    """연결 직후 TCP_NODELAY 설정 — Nagle 지연이 소형 Modbus PDU 를 묶는 것을 방지."""
+    try:
+        transport = getattr(client, "transport", None) \
+            or getattr(getattr(client, "ctx", None), "transport", None)
+        sock = transport.get_extra_info("socket") if transport else None
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    except Exception:
+        pass  # pymodbus 버전에 따라 transport 위치가 다를 수 있음
+
+
+try:
+    import numba
+except ImportError:          # numba 는 선택 의존성 — 없으면 NumPy 경로 사용
+    numba = None
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _decode_kernel(bits, regs, bit_rows, bit_pos, u16_rows, u16_pos,
+                       s16_rows, s16_pos, s32_rows, s32_pos, out):
+        """포맷별 NumPy 패스 4회를 한 번의 융합 루프로 수행(임시 배열 없음)."""
+        for i in range(bit_rows.size):
+            out[bit_rows[i]] = bits[bit_pos[i]]
+        for i in range(u16_rows.size):
+            out[u16_rows[i]] = regs[u16_pos[i]]
+        for i in range(s16_rows.size):
+            v = np.int64(regs[s16_pos[i]])
+            out[s16_rows[i]] = v - 0x10000 if v & 0x8000 else v
+        for i in range(s32_rows.size):
+            v = np.int64(regs[s32_pos[i]]) | (np.int64(regs[s32_pos[i] + 1]) << 16)
+            out[s32_rows[i]] = v - 0x100000000 if v & 0x80000000 else v
+else:
+    _decode_kernel = None
 
 
 # ────────────────────────── 데이터 클래스 ──────────────────────────
@@ -62,30 +102,45 @@ def parse_int(val) -> int:
     return int(txt, 16) if any(c in txt.upper() for c in "ABCDEF") else int(txt)
 
 
-def build_mapping(df: pd.DataFrame) -> Dict[str, List[Dict[str, int]]]:
+def _read_sheet(path: Path) -> Tuple[Dict[str, int], List[tuple]]:
+    """첫 시트를 스트리밍으로 읽어 (컬럼명→인덱스, 데이터 행 목록) 반환."""
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        it = wb.active.iter_rows(values_only=True)
+        header = next(it, ())
+        cols = {str(h).strip(): i for i, h in enumerate(header) if h is not None}
+        rows = [r for r in it if any(c is not None for c in r)]
+    finally:
+        wb.close()
+    return cols, rows
+
+
+def build_mapping(cols: Dict[str, int],
+                  rows: List[tuple]) -> Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
     required = {"mem", "plc_addr", "start_number", "assignment_points"}
-    if not required.issubset(df.columns):
+    if not required.issubset(cols):
         raise ValueError(f"매핑 시트에는 {required} 컬럼이 필요합니다.")
-    mp: Dict[str, List[Dict[str, int]]] = {}
-    for _, r in df.iterrows():
-        mem = str(r["mem"]).strip().upper()
-        mp.setdefault(mem, []).append(
-            {
-                "plc_base": parse_int(r["plc_addr"]),
-                "mb_base":  parse_int(r["start_number"]),
-                "count":    int(r["assignment_points"]),
-            }
-        )
-    for segs in mp.values():
-        segs.sort(key=lambda s: s["plc_base"])
-    return mp
+    im, ip, isn, iap = (cols[c] for c in
+                        ("mem", "plc_addr", "start_number", "assignment_points"))
+    mp: Dict[str, List[Tuple[int, int, int]]] = {}
+    for r in rows:
+        mem = str(r[im]).strip().upper()
+        mp.setdefault(mem, []).append((parse_int(r[ip]), parse_int(r[isn]), int(r[iap])))
+    # 세그먼트를 정렬된 병렬 배열(plc_base, mb_base, count)로 변환 — 이진 탐색용
+    out: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+    for mem, segs in mp.items():
+        segs.sort()
+        arr = np.array(segs, dtype=np.int64)
+        out[mem] = (arr[:, 0], arr[:, 1], arr[:, 2])
+    return out
 
 
 def plc_to_modbus(mem: str, plc_addr: int,
-                  mapping: Dict[str, List[Dict[str, int]]]) -> int:
-    for seg in mapping[mem]:
-        if seg["plc_base"] <= plc_addr < seg["plc_base"] + seg["count"]:
-            return seg["mb_base"] + (plc_addr - seg["plc_base"])
+                  mapping: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]) -> int:
+    bases, mbs, counts = mapping[mem]
+    i = int(np.searchsorted(bases, plc_addr, side="right")) - 1
+    if i >= 0 and plc_addr < bases[i] + counts[i]:
+        return int(mbs[i] + (plc_addr - bases[i]))
     raise ValueError(f"{mem}{plc_addr} 가 매핑 범위를 벗어났습니다.")
 
 
@@ -97,7 +152,7 @@ def _normalize_type(tp_val) -> str:
     'u16' / 'U16'              → 'u16'
     (NaN or 공백)              → ''
     """
-    if pd.isna(tp_val):
+    if tp_val is None:            # openpyxl 은 빈 셀을 None 으로 준다
         return ""
     if isinstance(tp_val, (int, float)):
         tp_val = str(int(tp_val))
@@ -110,15 +165,17 @@ def _normalize_type(tp_val) -> str:
 
 
 def load_points(mapping_path: Path, config_path: Path) -> List[ModbusPoint]:
-    mp_df = pd.read_excel(mapping_path)
-    cfg_df = pd.read_excel(config_path)
-    mapping = build_mapping(mp_df)
+    mapping = build_mapping(*_read_sheet(mapping_path))
+    cols, rows = _read_sheet(config_path)
 
     points: List[ModbusPoint] = []
-    for _, r in cfg_df.iterrows():
-        mem      = str(r["mem"]).strip().upper()
-        plc_addr = parse_int(r["plc_addr"])
-        label    = str(r.get("desc")) if pd.notna(r.get("desc")) else f"{mem}{plc_addr}"
+    im, ip = cols["mem"], cols["plc_addr"]
+    idesc, itype = cols.get("desc"), cols.get("type")
+    for r in rows:
+        mem      = str(r[im]).strip().upper()
+        plc_addr = parse_int(r[ip])
+        desc     = r[idesc] if idesc is not None else None
+        label    = str(desc) if desc is not None else f"{mem}{plc_addr}"
         mb_addr  = plc_to_modbus(mem, plc_addr, mapping)
         method   = MEM_METHOD.get(mem)
         if not method:
@@ -126,7 +183,7 @@ def load_points(mapping_path: Path, config_path: Path) -> List[ModbusPoint]:
 
         # ---- 타입 결정 ----
         if mem == "D":
-            tp_norm = _normalize_type(r.get("type"))
+            tp_norm = _normalize_type(r[itype] if itype is not None else None)
             if tp_norm == "s16":
                 size, fmt = 1, "s16"
             elif tp_norm == "u16":
@@ -140,6 +197,13 @@ def load_points(mapping_path: Path, config_path: Path) -> List[ModbusPoint]:
     return points
 
 
+@functools.lru_cache(maxsize=8)
+def _load_points_cached(mapping_str: str, config_str: str,
+                        _mp_key: Tuple[int, int], _cf_key: Tuple[int, int]) -> Tuple[ModbusPoint, ...]:
+    """(경로, mtime_ns, size) 가 같으면 파싱 결과를 재사용 — Start 재클릭을 µs 로."""
+    return tuple(load_points(Path(mapping_str), Path(config_str)))
+
+
 # ────────────────────────── 워커 (Batching) ──────────────────────────
 class ModbusWorker(QObject):
     log_ready = Signal(str)
@@ -151,6 +215,39 @@ class ModbusWorker(QObject):
         self.ip, self.port, self.points, self.interval = ip, port, points, interval
         self._running = True
         self._batches: List[Batch] = self._make_batches(points)
+        self._log_buf: List[str] = []   # emit 를 묶어 Qt 신호·위젯 갱신 횟수를 줄인다
+        self._date_str = ""; self._date_day = -1   # 날짜 문자열은 날이 바뀔 때만 갱신
+        self._row_buf: List[tuple] = []     # writerows 로 묶어 내릴 행 버퍼
+        # 패킷 유실 시 pymodbus 기본 타임아웃(수 초)이 poll 을 얼리지 않도록 상한
+        self._batch_timeout = max(0.2, interval * 0.8 / max(1, len(self._batches)))
+        self._last_emit = 0.0
+        # SoA 디코드 플랜: 배치 payload 를 풀 배열에 이어붙이고,
+        # 포인트별 (출력 행, 풀 위치)를 포맷별 평탄 배열로 1회 계산한다.
+        row_of = {id(pt): i for i, pt in enumerate(points)}
+        bit_base: Dict[int, int] = {}; reg_base: Dict[int, int] = {}
+        nbit = nreg = 0
+        for b in self._batches:
+            if b.method in ("read_coils", "read_discrete_inputs"):
+                bit_base[id(b)] = nbit; nbit += b.count
+            else:
+                reg_base[id(b)] = nreg; nreg += b.count
+        self._bit_pool = np.zeros(nbit, dtype=np.uint8)     # poll 마다 재사용
+        self._reg_pool = np.zeros(nreg, dtype=np.uint16)
+        sel: Dict[str, Tuple[list, list]] = {f: ([], []) for f in ("bit", "u16", "s16", "s32")}
+        for b in self._batches:
+            base = bit_base[id(b)] if id(b) in bit_base else reg_base[id(b)]
+            for pt in b.points:
+                rows_l, pos_l = sel[pt.fmt]
+                rows_l.append(row_of[id(pt)]); pos_l.append(base + pt.offset - b.start)
+        (self._bit_rows, self._bit_pos), (self._u16_rows, self._u16_pos), \
+            (self._s16_rows, self._s16_pos), (self._s32_rows, self._s32_pos) = (
+                tuple(np.array(part, dtype=np.intp) for part in sel[f])
+                for f in ("bit", "u16", "s16", "s32"))
+        self._rows_of_batch: Dict[int, np.ndarray] = {
+            id(b): np.array([row_of[id(pt)] for pt in b.points], dtype=np.intp)
+            for b in self._batches}
+        self._row_vals = np.empty(len(points), dtype=np.int64)   # poll 마다 재사용하는 출력 버퍼
+        self._failed: List[np.ndarray] = []                     # poll 마다 재사용하는 스크래치
 
     def stop(self):
         self._running = False
@@ -165,38 +262,24 @@ class ModbusWorker(QObject):
         batches: List[Batch] = []
         for method, pts in grouped.items():
             pts.sort(key=lambda p: p.offset)
+            max_qty = MAX_QTY[method]
             i = 0
             while i < len(pts):
                 start = pts[i].offset
                 end   = start + pts[i].size
                 batch_pts = [pts[i]]
                 i += 1
-                # 인접(겹치지 않고 gap 없는) 포인트까지 확장
-                while i < len(pts) and pts[i].offset == end:
+                # MAX_GAP 이하의 구멍까지 허용하여 클러스터 단위로 병합
+                while (i < len(pts)
+                       and pts[i].offset - end <= MAX_GAP
+                       and pts[i].offset + pts[i].size - start <= max_qty):
                     batch_pts.append(pts[i])
-                    end += pts[i].size
+                    # 중복·포함 포인트로 span 이 줄어들지 않게 max 유지
+                    end = max(end, pts[i].offset + pts[i].size)
                     i  += 1
                 batches.append(Batch(method, start, end - start, batch_pts))
         return batches
 
-    # ---------- 값 추출 ----------
-    @staticmethod
-    def _decode_value(pt: ModbusPoint, data) -> int:
-        """data: bit list 또는 register list"""
-        idx = pt.offset - data["start"]
-        if pt.method in ("read_coils", "read_discrete_inputs"):
-            return int(data["bits"][idx])
-        if pt.size == 1:
-            raw = data["regs"][idx]
-            if pt.fmt == "s16":
-                return _u16_to_s16(raw)
-            return raw                # u16
-        else:  # 32-bit
-            low  = data["regs"][idx]
-            high = data["regs"][idx + 1]
-            val  = (high << 16) | low     # 워드 순서: Low→High (필요시 교체)
-            return _u32_to_s32(val)
-
     # ---------- 메인 루프 ----------
     async def run(self):
         client = AsyncModbusTcpClient(self.ip, port=self.port)
@@ -204,62 +287,105 @@ class ModbusWorker(QObject):
             if not await client.connect():
                 self.log_ready.emit("❌ PLC 연결 실패\n")
                 return
+            _enable_nodelay(client)
+            # poll 마다 getattr 로 찾지 않도록 읽기 메서드를 1회 바인딩
+            self._method_fns = {m: getattr(client, m)
+                                for m in {b.method for b in self._batches}}
 
             csv_p = Path(f"modbus_log_{datetime.datetime.now():%Y%m%d_%H%M%S}.csv")
-            with csv_p.open("w", newline="") as f:
+            # 큰 버퍼로 열어 행마다 write() 시스템콜이 발생하지 않게 한다
+            with csv_p.open("w", newline="", buffering=1 << 20) as f:
                 self.log_ready.emit(f"📂 기록 파일: {csv_p}\n")
                 writer = csv.writer(f)
                 writer.writerow(["timestamp"] + [pt.label for pt in self.points])
+                rows = 0
 
                 while self._running:
-                    # --- batch read ---
-                    batch_data: Dict[Tuple[str, int], Dict] = {}
-                    for b in self._batches:
-                        rr = await getattr(client, b.method)(b.start, count=b.count)
-                        if rr.isError():
-                            batch_data[(b.method, b.start)] = {}
-                            continue
+                    # --- batch read: 독립 배치를 한 RTT 에 파이프라인 ---
+                    results = await asyncio.gather(
+                        *(asyncio.wait_for(
+                            self._method_fns[b.method](b.start, count=b.count),
+                            timeout=self._batch_timeout)
+                          for b in self._batches),
+                        return_exceptions=True,
+                    )
+                    # --- SoA 디코드: payload 를 풀에 모은 뒤 포맷별 일괄 변환 ---
+                    out, bits, regs = self._row_vals, self._bit_pool, self._reg_pool
+                    nbit = nreg = 0
+                    failed = self._failed; failed.clear()
+                    for b, rr in zip(self._batches, results):
+                        ok = not (isinstance(rr, BaseException) or rr.isError())
                         if b.method in ("read_coils", "read_discrete_inputs"):
-                            batch_data[(b.method, b.start)] = {
-                                "start": b.start, "bits": rr.bits
-                            }
-                        else:  # registers
-                            batch_data[(b.method, b.start)] = {
-                                "start": b.start, "regs": rr.registers
-                            }
-
-                    # --- 개별 포인트 추출 ---
-                    row_vals: List[int] = []
-                    for pt in self.points:
-                        key = (pt.method, self._batch_start(pt))
-                        bdat = batch_data.get(key, {})
-                        if not bdat:
-                            val = -1
+                            if ok:
+                                # bytes() 가 bool 리스트를 C 루프로 묶고 frombuffer 는 무복사
+                                bits[nbit:nbit + b.count] = np.frombuffer(
+                                    bytes(rr.bits[:b.count]), dtype=np.uint8)
+                            else:
+                                failed.append(self._rows_of_batch[id(b)])
+                            nbit += b.count
                         else:
-                            try:
-                                val = self._decode_value(pt, bdat)
-                            except Exception:
-                                val = -1
-                        row_vals.append(val)
-
-                    now = datetime.datetime.now()
-                    ts  = f"{now:%Y-%m-%dT%H:%M:%S}.{now.microsecond//100000}"
-                    writer.writerow([ts] + row_vals)
-                    self.log_ready.emit(f"{ts}  {row_vals}\n")
+                            if ok:
+                                regs[nreg:nreg + b.count] = np.asarray(rr.registers, dtype=np.uint16)
+                            else:
+                                failed.append(self._rows_of_batch[id(b)])
+                            nreg += b.count
+                    if _decode_kernel is not None:
+                        _decode_kernel(bits, regs, self._bit_rows, self._bit_pos,
+                                       self._u16_rows, self._u16_pos,
+                                       self._s16_rows, self._s16_pos,
+                                       self._s32_rows, self._s32_pos, out)
+                    else:
+                        if self._bit_rows.size:
+                            out[self._bit_rows] = bits[self._bit_pos]
+                        if self._u16_rows.size:
+                            out[self._u16_rows] = regs[self._u16_pos]
+                        if self._s16_rows.size:
+                            out[self._s16_rows] = regs[self._s16_pos].view(np.int16)
+                        if self._s32_rows.size:
+                            u32 = regs[self._s32_pos].astype(np.uint32) \
+                                | (regs[self._s32_pos + 1].astype(np.uint32) << 16)
+                            out[self._s32_rows] = u32.view(np.int32)
+                    for fail_rows in failed:   # 실패한 배치의 포인트만 -1
+                        out[fail_rows] = -1
+                    row_vals: List[int] = out.tolist()
+
+                    t = time.time()
+                    lt = time.localtime(t)
+                    if lt.tm_mday != self._date_day:     # full datetime 생성/포맷 회피
+                        self._date_day = lt.tm_mday
+                        self._date_str = f"{lt.tm_year:04d}-{lt.tm_mon:02d}-{lt.tm_mday:02d}T"
+                    ts = (f"{self._date_str}{lt.tm_hour:02d}:{lt.tm_min:02d}:"
+                          f"{lt.tm_sec:02d}.{int(t * 10) % 10}")
+                    self._row_buf.append((ts, *row_vals))   # 튜플 — 리스트 연결 없음
+                    if len(self._row_buf) >= 32:
+                        writer.writerows(self._row_buf)
+                        self._row_buf.clear()
+                        rows += 32
+                        if rows % FLUSH_EVERY == 0:
+                            f.flush()
+                    self._log_buf.append(f"{ts}  {row_vals}\n")
+                    now_m = time.monotonic()
+                    if len(self._log_buf) >= 16 or now_m - self._last_emit > 0.25:
+                        self.log_ready.emit("".join(self._log_buf))
+                        self._log_buf.clear()
+                        self._last_emit = now_m
                     await asyncio.sleep(self.interval)
+
+                if self._row_buf:
+                    writer.writerows(self._row_buf)
+                    self._row_buf.clear()
+                f.flush()
+                os.fsync(f.fileno())    # 동기화는 종료 시 1회만
         except Exception as e:
             self.log_ready.emit(f"🚨 {e}\n")
         finally:
+            if self._log_buf:
+                self.log_ready.emit("".join(self._log_buf))
+                self._log_buf.clear()
             with contextlib.suppress(Exception):
                 client.close()
             self.finished.emit()
 
-    # 배치 시작 오프셋 빠르게 구하는 헬퍼
-    def _batch_start(self, pt: ModbusPoint) -> int:
-        for b in self._batches:
-            if b.method == pt.method and b.start <= pt.offset < b.start + b.count:
-                return b.start
-        raise RuntimeError("배치 검색 실패")  # 논리적으로 발생하지 않음
 
 
 # ────────────────────────── 이하 GUI 부분은 v0.7.3과 동일 ──────────────────────────
@@ -315,7 +441,8 @@ class MainWindow(QWidget):
         form.addRow(row_btn)
 
         # 로그
-        self.log = QTextEdit(); self.log.setReadOnly(True)
+        self.log = QPlainTextEdit(); self.log.setReadOnly(True)
+        self.log.setMaximumBlockCount(5000)   # 문서 길이 상한
         form.addRow(self.log)
 
         # 신호
@@ -323,12 +450,14 @@ class MainWindow(QWidget):
         self.stop.clicked.connect(self.stop_poll)
 
     # 포인트 로드
-    def _load_points(self) -> List[ModbusPoint]:
-        mp_p = Path(self.mapping_path.text()).expanduser()
-        cf_p = Path(self.config_path.text()).expanduser()
+    @staticmethod
+    def _load_points(mp_p: Path, cf_p: Path) -> List[ModbusPoint]:
         if not mp_p.exists() or not cf_p.exists():
             raise FileNotFoundError("Excel 파일을 찾을 수 없습니다.")
-        return load_points(mp_p, cf_p)
+        mp_st, cf_st = mp_p.stat(), cf_p.stat()
+        return list(_load_points_cached(str(mp_p), str(cf_p),
+                                        (mp_st.st_mtime_ns, mp_st.st_size),
+                                        (cf_st.st_mtime_ns, cf_st.st_size)))
 
     # 시작
     @qasync.asyncSlot()
@@ -338,10 +467,16 @@ class MainWindow(QWidget):
         if self.interval.value() < 0.05:
             QMessageBox.warning(self, "간격 오류", "0.05 초 이상으로 설정하세요.")
             return
+        # 경로는 GUI 스레드에서 읽고, 파싱은 executor 스레드로 — 큰 xlsx 로드 중 UI 동결 방지
+        mp_p = Path(self.mapping_path.text()).expanduser()
+        cf_p = Path(self.config_path.text()).expanduser()
+        self.start.setEnabled(False)
         try:
-            points = self._load_points()
+            points = await asyncio.get_running_loop().run_in_executor(
+                None, self._load_points, mp_p, cf_p)
         except Exception as e:
             QMessageBox.critical(self, "파일 오류", str(e))
+            self.start.setEnabled(True)
             return
 
         self.worker = ModbusWorker(self.ip.text().strip(), self.port.value(),
@@ -363,9 +498,7 @@ class MainWindow(QWidget):
         self.append_log("▶ 작업 종료\n")
 
     def append_log(self, msg: str):
-        self.log.moveCursor(QTextCursor.End)
-        self.log.insertPlainText(msg)
-        self.log.moveCursor(QTextCursor.End)
+        self.log.appendPlainText(msg.rstrip("\n"))   # 자동 스크롤 포함, 커서 조작 불필요
 
     def closeEvent(self, ev):
         if self.worker:
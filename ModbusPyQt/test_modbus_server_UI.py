@@ -13,23 +13,21 @@ Modbus‑TCP Server GUI (Pyside6 only) – v0.1
 * 값 수정 → `pymodbus` Datastore 컨텍스트에 즉시 반영.
 * [Stop] 후 다시 설정 변경 가능.
 
-의존: `pip install PySide6 pymodbus>=3.9 qasync`
+의존: `pip install PySide6>=6.6 pymodbus>=3.9` (구버전 PySide6 는 qasync 필요)
 """
 
 from __future__ import annotations
 
 import sys, asyncio
-from functools import partial
 
 from PySide6.QtWidgets import (
     QApplication, QWidget, QLabel, QSpinBox, QComboBox, QPushButton,
     QVBoxLayout, QHBoxLayout, QScrollArea, QCheckBox, QFrame, QMessageBox
 )
-from PySide6.QtCore import Qt, Signal, QObject
+from PySide6.QtCore import Qt, Signal, QObject, QTimer
 
 from pymodbus.server import StartAsyncTcpServer
-from pymodbus.datastore import ModbusSparseDataBlock, ModbusSlaveContext, ModbusServerContext
-import qasync
+from pymodbus.datastore import ModbusSequentialDataBlock, ModbusSlaveContext, ModbusServerContext
 
 # ─── Modbus 테이블 정의 ──────────────────────────────────────────
 TABLES = {
@@ -61,7 +59,8 @@ class Runner(QObject):
         if self._task and not self._task.done():
             return
         self.context = context
-        self._task = asyncio.create_task(self._serve())
+        # QtAsyncio/qasync 어느 브리지에서도 동작하도록 ensure_future 사용
+        self._task = asyncio.ensure_future(self._serve())
 
     def stop(self):
         if self._task and not self._task.done():
@@ -77,6 +76,14 @@ class ServerUI(QWidget):
         # state
         self.runner = Runner(); self.runner.running_changed.connect(self._toggle_lock)
         self.widgets: list[QCheckBox | QSpinBox] = []
+        # Generate 마다 위젯을 파괴/재생성하지 않도록 타입별 풀에 보관해 재사용
+        self._pool_bools: list[QCheckBox] = []
+        self._pool_ints: list[tuple[QFrame, QLabel, QSpinBox]] = []
+
+        # 편집 디바운스: 값 변경을 모아 50 ms 후 연속 주소 단위로 한 번에 setValues
+        self._pending: dict[int, int] = {}
+        self._flush_timer = QTimer(self); self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(50); self._flush_timer.timeout.connect(self._flush)
 
         self._build()
 
@@ -113,47 +120,95 @@ class ServerUI(QWidget):
 
         self._generate()  # initial render
 
-    # build value widgets anew
+    # reuse pooled value widgets (re-label/reset instead of delete+create)
     def _generate(self):
-        for w in self.widgets:
-            w.setParent(None); w.deleteLater()
-        self.widgets.clear()
-
         info = TABLES[self.table.currentText()]
         start, count = self.start_spin.value(), self.count_spin.value()
+        # 콜백·플러시가 키 입력마다 QComboBox/QSpinBox C++ 호출과 dict 조회를
+        # 반복하지 않도록 Generate 시점에 스냅샷 (서버 동작 중엔 설정이 잠김)
+        self._active_info, self._active_base = info, start
+
+        for cb in self._pool_bools:
+            cb.hide()
+        for cont, _lab, _spin in self._pool_ints:
+            cont.hide()
+        self.widgets.clear()
 
-        for i in range(count):
-            addr = start + i
-            if info["dtype"] == "bool":
-                cb = QCheckBox(f"{addr}"); cb.setChecked(False)
-                cb.stateChanged.connect(partial(self._bool_changed, i))
-                self.vbox.addWidget(cb); self.widgets.append(cb)
-            else:
+        if info["dtype"] == "bool":
+            while len(self._pool_bools) < count:   # 부족분만 생성
+                cb = QCheckBox()
+                # 위젯당 partial 을 만들지 않고 offset 프로퍼티 + 공용 슬롯 사용
+                cb.stateChanged.connect(self._bool_changed)
+                self.vbox.addWidget(cb); self._pool_bools.append(cb)
+            for i in range(count):
+                cb = self._pool_bools[i]
+                cb.blockSignals(True); cb.setText(f"{start + i}"); cb.setChecked(False); cb.blockSignals(False)
+                cb.setProperty("offset", i); cb.show()
+                self.widgets.append(cb)
+        else:
+            while len(self._pool_ints) < count:
                 spin = QSpinBox(); spin.setRange(0, 65535)
-                spin.valueChanged.connect(partial(self._int_changed, i))
-                row = QHBoxLayout(); row.addWidget(QLabel(f"{addr}")); row.addWidget(spin)
+                spin.valueChanged.connect(self._int_changed)
+                lab = QLabel()
+                row = QHBoxLayout(); row.addWidget(lab); row.addWidget(spin)
                 cont = QFrame(); cont.setLayout(row)
-                self.vbox.addWidget(cont); self.widgets.append(spin)
+                self.vbox.addWidget(cont); self._pool_ints.append((cont, lab, spin))
+            for i in range(count):
+                cont, lab, spin = self._pool_ints[i]
+                lab.setText(f"{start + i}")
+                spin.blockSignals(True); spin.setValue(0); spin.blockSignals(False)
+                spin.setProperty("offset", i); cont.show()
+                self.widgets.append(spin)
 
     # value callbacks
-    def _bool_changed(self, offset:int, state:int):
+    def _bool_changed(self, state:int):
         if not self.runner.context: return
-        base = self.start_spin.value(); addr = base+offset
-        fc = TABLES[self.table.currentText()]["fc"]
-        self.runner.context[0].setValues(fc, addr, [1 if state==Qt.Checked else 0])
+        offset = self.sender().property("offset")
+        self._pending[self._active_base + offset] = 1 if state==Qt.Checked else 0
+        self._flush_timer.start()
 
-    def _int_changed(self, offset:int, val:int):
+    def _int_changed(self, val:int):
         if not self.runner.context: return
-        base = self.start_spin.value(); addr = base+offset
-        fc = TABLES[self.table.currentText()]["fc"]
-        self.runner.context[0].setValues(fc, addr, [val])
+        offset = self.sender().property("offset")
+        self._pending[self._active_base + offset] = val
+        self._flush_timer.start()
+
+    def _store_run(self, ctx, info, start: int, vals: list[int]):
+        # 우리가 만든 시퀀셜 블록이므로 FC 디스패치·주소 검증을 거치지 않고
+        # 내부 리스트에 직접 슬라이스 저장 (zero_mode=False 인 SlaveContext 가
+        # 더하는 +1 오프셋을 동일하게 보정).  내부 구조가 다른 pymodbus
+        # 버전에서는 setValues 로 폴백.
+        try:
+            block = ctx.store[info["block"][0]]          # "co"→"c", "hr"→"h" …
+            idx = start + 1 - block.address
+            block.values[idx:idx + len(vals)] = vals
+        except (AttributeError, KeyError, IndexError):
+            ctx.setValues(info["fc"], start, vals)
+
+    def _flush(self):
+        if not self._pending or not self.runner.context:
+            self._pending.clear(); return
+        info = self._active_info
+        ctx = self.runner.context[0]
+        addrs = sorted(self._pending)
+        run_start = prev = addrs[0]; vals = [self._pending[prev]]
+        for a in addrs[1:]:
+            if a == prev + 1:
+                vals.append(self._pending[a])
+            else:
+                self._store_run(ctx, info, run_start, vals)   # 연속 구간마다 1회 기록
+                run_start, vals = a, [self._pending[a]]
+            prev = a
+        self._store_run(ctx, info, run_start, vals)
+        self._pending.clear()
 
     # start server
     def _start(self):
         info = TABLES[self.table.currentText()]
         start, count = self.start_spin.value(), self.count_spin.value()
-        regmap = {start+i: 0 for i in range(count)}
-        blocks = {info["block"]: ModbusSparseDataBlock(regmap)}
+        # 주소가 start..start+count-1 로 연속이므로 list 기반 블록이 슬라이스로 동작.
+        # zero_mode=False 컨텍스트가 주소에 +1 을 더하므로 1칸 여유를 둔다.
+        blocks = {info["block"]: ModbusSequentialDataBlock(start, [0] * (count + 1))}
         ctx = ModbusServerContext(slaves=ModbusSlaveContext(**blocks), single=True)
         self.runner.start(ctx)
 
@@ -168,8 +223,13 @@ class ServerUI(QWidget):
 # ─── entry ─────────────────────────────────────────────────────────
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    loop = qasync.QEventLoop(app); asyncio.set_event_loop(loop)
-
     win = ServerUI(); win.show()
-    with loop:
-        loop.run_forever()
+    try:
+        # PySide6 ≥ 6.6: 폴링 어댑터 없는 네이티브 Qt/asyncio 브리지
+        import PySide6.QtAsyncio as QtAsyncio
+        QtAsyncio.run(handle_sigint=True)
+    except ImportError:
+        import qasync
+        loop = qasync.QEventLoop(app); asyncio.set_event_loop(loop)
+        with loop:
+            loop.run_forever()
@@ -3,20 +3,26 @@
 pymodbus 3.x – Modbus-TCP 클라이언트
 1초마다 Coil 10~17 읽어서 표시
 """
-import time
+import socket, time
 from pymodbus.client import ModbusTcpClient
 
 SERVER_IP, PORT  = "127.0.0.1", 502
 SLAVE_ID         = 0          # 서버가 single=True → ID 0
+MAX_COILS        = 18         # 서버 전체 범위 — 한 번에 읽고 필요한 구간만 슬라이스
 
 def main():
     with ModbusTcpClient(SERVER_IP, port=PORT) as client:
+        # 소형 PDU 가 Nagle 에 묶여 수십 ms 지연되지 않도록 TCP_NODELAY
+        try:
+            client.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except Exception:
+            pass
         while True:
-            rr = client.read_coils(0, count=8)
+            rr = client.read_coils(0, count=MAX_COILS)
             if rr.isError():
                 print("❌", rr)
             else:
-                print("Coils 0-8:", rr.bits)
+                print("Coils 10-17:", rr.bits[10:18])
             time.sleep(1)
 
 if __name__ == "__main__":
@@ -11,9 +11,48 @@ from pymodbus.server import StartTcpServer
 
 HOST, PORT = "0.0.0.0", 502
 
-# 18개 코일(0~17)을 전부 0으로 만든 뒤 서버 컨텍스트 생성
-empty_word_list = [0] * 18          # 단순 자리수용, 실제 값은 아래에서 덮어씀
-slave = ModbusSlaveContext(co=ModbusSequentialDataBlock(0, empty_word_list))
+class PackedCoilBlock(ModbusSequentialDataBlock):
+    """코일을 8비트/바이트로 패킹해 저장하는 데이터 블록.
+
+    리스트(코일당 파이썬 int 1개) 대신 bytearray 에 비트로 담아 메모리를
+    1/8 로 줄이고, getValues 는 바이트당 미리 계산한 LUT 로 8비트씩 푼다.
+    Modbus 전송 포맷 자체가 8코일/바이트 패킹이므로 저장 형식과도 일치.
+    """
+
+    # 256개 바이트 값 → 비트 리스트 LUT (모듈 로드 시 1회 계산)
+    _UNPACK = [[(b >> i) & 1 for i in range(8)] for b in range(256)]
+
+    def __init__(self, address: int, size: int):
+        super().__init__(address, [0])        # 부모 초기화용 placeholder
+        self._size = size
+        self._bits = bytearray((size + 7) // 8)
+
+    def validate(self, address: int, count: int = 1) -> bool:
+        if count <= 0:
+            return False
+        return self.address <= address and address + count <= self.address + self._size
+
+    def getValues(self, address: int, count: int = 1) -> list[int]:
+        start = address - self.address
+        byte, bit = divmod(start, 8)
+        out: list[int] = []
+        for b in self._bits[byte:(start + count + 7) // 8]:
+            out.extend(self._UNPACK[b])       # 바이트 단위로 한 번에 언팩
+        return out[bit:bit + count]
+
+    def setValues(self, address: int, values) -> None:
+        if not isinstance(values, (list, tuple)):
+            values = [values]
+        start = address - self.address
+        for i, v in enumerate(values):
+            byte, bit = divmod(start + i, 8)
+            if v:
+                self._bits[byte] |= 1 << bit
+            else:
+                self._bits[byte] &= ~(1 << bit) & 0xFF
+
+# 코일 0~17 사용 + zero_mode=False 컨텍스트의 +1 오프셋 여유분 → 24비트(3바이트) 확보
+slave = ModbusSlaveContext(co=PackedCoilBlock(0, 24))
 context = ModbusServerContext(slaves=slave, single=True)   # 슬레이브 ID = 0
 
 # 원하는 패턴을 코일 비트(FC 1)에 직접 기록
@@ -3,12 +3,12 @@ registers every 0.5 s.  Press `q` then Enter in the console to
 shut the server down cleanly.``python"""
 
 from pymodbus.datastore import (
-    ModbusSparseDataBlock,
+    ModbusSequentialDataBlock,
     ModbusSlaveContext,
     ModbusServerContext,
 )
-from pymodbus.server import StartAsyncTcpServer
-import asyncio, random, sys
+from pymodbus.server import ModbusTcpServer, StartAsyncTcpServer
+import asyncio, os, random, socket, sys
 
 # -----------------------------------------------------------------
 # Register map – address : value (0‑base addressing)
@@ -17,39 +17,113 @@ import asyncio, random, sys
 # -----------------------------------------------------------------
 REGMAP = {0: 0, 1: 0, 100: 2500, 102: 123}
 
+# A sequential block stores values in a list, so range reads/writes are
+# slice operations instead of one dict lookup per register.
+_hr_init = [0] * 104                  # HR 0..102 + the +1 offset of zero_mode=False
+for _addr, _val in REGMAP.items():
+    _hr_init[_addr] = _val
 context = ModbusServerContext(
-    slaves=ModbusSlaveContext(hr=ModbusSparseDataBlock(REGMAP)),
+    slaves=ModbusSlaveContext(hr=ModbusSequentialDataBlock(0, _hr_init)),
     single=True,
 )
 
 async def updater(stop_event: asyncio.Event):
     """Update HR 100 with a random temperature every 0.5 s."""
+    last = None
     while not stop_event.is_set():
         REGMAP[100] = int(random.uniform(20, 30) * 100)
-        context[0x00].setValues(0, 100, [REGMAP[100]])
-        context[0x00].setValues(1, 102, [REGMAP[102]])
-        await asyncio.sleep(0.5)
-
-async def keyboard_listener(stop_event: asyncio.Event):
-    """Wait until the user types "q" then signal other tasks to stop."""
-    while True:
-        key = await asyncio.to_thread(input, "Press 'q' + Enter to quit › ")
-        if key.strip().lower() == "q":
+        changed = REGMAP[100] != last
+        if changed:
+            # One FC03 write covering HR 100..102 instead of two calls with
+            # bogus function codes (0/1 addressed the coil table, so the
+            # registers clients read were never actually updated).
+            context[0x00].setValues(3, 100, [REGMAP[100], REGMAP.get(101, 0), REGMAP[102]])
+            last = REGMAP[100]
+        # back off while idle to halve datastore contention
+        await asyncio.sleep(0.5 if changed else 1.0)
+
+def watch_stdin(loop: asyncio.AbstractEventLoop, stop_event: asyncio.Event) -> bool:
+    """Signal *stop_event* when the user types "q" + Enter.
+
+    Uses ``loop.add_reader`` so no thread sits blocked in ``input()``;
+    the callback only runs once stdin actually has data.  Returns False
+    on loops without file-descriptor readers (Windows Proactor), where
+    a single daemon thread is used instead.
+    """
+    def _on_stdin():
+        line = sys.stdin.readline()
+        if not line:                     # EOF: fd stays readable → unhook or we spin
+            loop.remove_reader(sys.stdin.fileno())
+            return
+        if line.strip().lower().startswith("q"):
             stop_event.set()
-            break
+    try:
+        loop.add_reader(sys.stdin.fileno(), _on_stdin)
+        return True
+    except NotImplementedError:
+        import threading
+        def _wait_q():
+            while input().strip().lower() != "q":
+                pass
+            loop.call_soon_threadsafe(stop_event.set)
+        threading.Thread(target=_wait_q, daemon=True).start()
+        return False
+
+async def serve(ctx):
+    """Accept Modbus-TCP connections on port 502.
+
+    Where the platform has SO_REUSEPORT (Linux/BSD), one listener socket
+    is bound per CPU so the kernel spreads accept bursts across their
+    queues — and further server processes can bind the same port for
+    horizontal scaling.  Everything else falls back to the stock
+    single-socket pymodbus server.
+    """
+    if hasattr(socket, "SO_REUSEPORT"):
+        socks = []
+        try:
+            server = ModbusTcpServer(ctx, address=("0.0.0.0", 502))
+            loop = asyncio.get_running_loop()
+            for _ in range(os.cpu_count() or 1):
+                sk = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sk.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+                sk.bind(("0.0.0.0", 502))
+                sk.listen()
+                sk.setblocking(False)
+                socks.append(sk)
+            listeners = [await loop.create_server(server.handle_new_connection, sock=sk)
+                         for sk in socks]
+            try:
+                await asyncio.gather(*(srv.serve_forever() for srv in listeners))
+            finally:
+                for srv in listeners:
+                    srv.close()
+            return
+        except (AttributeError, TypeError, OSError):
+            # pymodbus internals moved, or bind failed — use the plain server
+            for sk in socks:
+                sk.close()
+    await StartAsyncTcpServer(ctx, address=("0.0.0.0", 502))
 
 async def main():
     stop_event = asyncio.Event()
 
-    server_task   = asyncio.create_task(StartAsyncTcpServer(context, address=("0.0.0.0", 502)))
-    updater_task  = asyncio.create_task(updater(stop_event))
-    listener_task = asyncio.create_task(keyboard_listener(stop_event))
+    # Accepted sockets get TCP_NODELAY from asyncio's default transport
+    # options, so no per-connection tweak is needed on the server side.
+    server_task  = asyncio.create_task(serve(context))
+    updater_task = asyncio.create_task(updater(stop_event))
 
-    await stop_event.wait()          # block until "q" pressed
+    loop = asyncio.get_running_loop()
+    reader_added = watch_stdin(loop, stop_event)
+    print("Press 'q' + Enter to quit ›")
+    try:
+        await stop_event.wait()      # block until "q" pressed
+    finally:
+        if reader_added:
+            loop.remove_reader(sys.stdin.fileno())
     print("\nShutting down …")
 
     server_task.cancel()             # stop TCP server
-    await asyncio.gather(server_task, updater_task, listener_task, return_exceptions=True)
+    await asyncio.gather(server_task, updater_task, return_exceptions=True)
 
 if __name__ == "__main__":
     try: